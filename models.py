@@ -4,8 +4,9 @@ SQLAlchemy ORM models for multi-router DDoS monitoring system
 """
 
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float, ForeignKey, Text, DateTime, text
+from sqlalchemy import create_engine, event, Column, Index, Integer, String, Boolean, Float, ForeignKey, Text, DateTime, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.sql import func
 
@@ -38,8 +39,16 @@ class Router(Base):
         return f"<Router(id={self.id}, name='{self.name}', host='{self.host}', status='{self.status}')>"
     
     def to_dict(self):
-        """Convert to dictionary for API responses"""
-        return {
+        """Convert to dictionary for API responses
+
+        The dict is cached on the instance and rebuilt only after a
+        column is assigned or the instance is refreshed, so repeated
+        serialization of the same router is free.
+        """
+        cached = self.__dict__.get('_dict_cache')
+        if cached is not None:
+            return cached
+        result = {
             'id': self.id,
             'name': self.name,
             'host': self.host,
@@ -52,12 +61,31 @@ class Router(Base):
             'last_seen': self.last_seen.isoformat() if self.last_seen else None,
             'status': self.status
         }
+        # Bypass __setattr__ so storing the cache does not invalidate it
+        self.__dict__['_dict_cache'] = result
+        return result
+
+    def __setattr__(self, key, value):
+        if not key.startswith('_'):
+            self.__dict__.pop('_dict_cache', None)
+        super().__setattr__(key, value)
+
+
+@event.listens_for(Router, 'refresh')
+def _clear_router_dict_cache(target, context, attrs):
+    """Drop the cached to_dict payload when the ORM reloads the row"""
+    target.__dict__.pop('_dict_cache', None)
 
 
 class Event(Base):
     """DDoS event model"""
     __tablename__ = 'events'
-    
+    __table_args__ = (
+        # Per-router event queries filter on router_id and order/range
+        # on timestamp; the composite index serves both in one seek
+        Index('ix_events_router_ts', 'router_id', 'timestamp'),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)
     router_id = Column(Integer, ForeignKey('routers.id', ondelete='CASCADE'), nullable=False, index=True)
     timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -96,7 +124,11 @@ class Event(Base):
 class BlockedIP(Base):
     """Blocked IP address model"""
     __tablename__ = 'blocked_ips'
-    
+    __table_args__ = (
+        # Lookups ask "is this IP already blocked on this router"
+        Index('ix_blocked_router_ip', 'router_id', 'ip_address'),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)
     router_id = Column(Integer, ForeignKey('routers.id', ondelete='CASCADE'), nullable=False, index=True)
     ip_address = Column(String(45), nullable=False, index=True)
@@ -264,14 +296,14 @@ class DatabaseManager:
         self.engine.dispose()
 
 
-# Global database instance
-_db_instance: Optional[DatabaseManager] = None
-
-
+@lru_cache(maxsize=8)
 def get_database(database_url: str = 'sqlite:///ddos_events.db') -> DatabaseManager:
-    """Get or create database manager instance"""
-    global _db_instance
-    if _db_instance is None:
-        _db_instance = DatabaseManager(database_url)
-        _db_instance.create_tables()
-    return _db_instance
+    """Get or create the database manager for a URL
+
+    Cached per URL: callers asking for the same database share one
+    engine, while a different URL (e.g. a test database) gets its own
+    manager instead of whichever instance happened to be created first.
+    """
+    manager = DatabaseManager(database_url)
+    manager.create_tables()
+    return manager
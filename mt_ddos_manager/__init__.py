@@ -1,11 +1,27 @@
 # mt_ddos_manager package
 
-from .config import Config
-from .monitor.router_client import RouterClient
-from .monitor.monitor import Monitor
-
 __all__ = [
     'Config',
     'RouterClient',
     'Monitor',
-]
\ No newline at end of file
+]
+
+# Submodules are resolved lazily (PEP 562) so importing the package does
+# not pull in SQLAlchemy/librouteros until an attribute is actually used.
+_lazy_imports = {
+    'Config': ('.config', 'Config'),
+    'RouterClient': ('.monitor.router_client', 'RouterClient'),
+    'Monitor': ('.monitor.monitor', 'Monitor'),
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _lazy_imports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
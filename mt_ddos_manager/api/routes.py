@@ -7,7 +7,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_tok
 from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models import Router, RouterConfig, User, Event, Metric, AddressList, ActionHistory
-import json
+from ..auth import login_limiter
 import bcrypt
 from datetime import datetime
 
@@ -29,6 +29,10 @@ def health_check():
 @api_bp.route('/auth/login', methods=['POST'])
 def login():
     """User login"""
+    # Reject brute-force attempts before any bcrypt or DB work
+    if login_limiter.is_limited(request.remote_addr or ''):
+        return jsonify({'error': 'Too many login attempts'}), 429
+
     data = request.get_json()
     if not data or not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Username and password required'}), 400
@@ -242,7 +246,7 @@ def add_address_list(router_id):
         router_id=router_id,
         action='add_address_list',
         initiated_by=get_jwt_identity(),
-        detail=json.dumps(data)
+        detail=data
     )
     db.add(action)
     db.commit()
@@ -271,7 +275,7 @@ def remove_address_list(router_id):
             router_id=router_id,
             action='remove_address_list',
             initiated_by=get_jwt_identity(),
-            detail=json.dumps(data)
+            detail=data
         )
         db.add(action)
         db.commit()
@@ -335,7 +339,7 @@ def get_events():
         'router_id': e.router_id,
         'type': e.type,
         'detail': e.detail,
-        'meta': json.loads(e.meta) if e.meta else None,
+        'meta': e.meta,
         'created_at': e.created_at.isoformat(),
         'severity': e.severity
     } for e in events])
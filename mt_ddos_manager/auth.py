@@ -2,11 +2,54 @@
 Authentication utilities for mt-ddos-manager
 """
 
+import threading
+import time
+
 from flask_jwt_extended import get_jwt
 from flask import jsonify
 from functools import wraps
 
 
+class LoginRateLimiter:
+    """
+    Per-IP login attempt limiter
+
+    Cheap first-line check so brute-force attempts are rejected in
+    microseconds before any database or bcrypt work. Counters live
+    in-process; swap for Redis INCR with TTL if the API is ever scaled
+    across multiple processes.
+    """
+
+    def __init__(self, max_attempts: int = 10, window_seconds: int = 60):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def is_limited(self, ip: str) -> bool:
+        """Record an attempt and return True if the IP is over the limit"""
+        now = time.monotonic()
+        with self._lock:
+            window_start, count = self._buckets.get(ip, (now, 0))
+            if now - window_start >= self.window_seconds:
+                window_start, count = now, 0
+            count += 1
+            self._buckets[ip] = (window_start, count)
+
+            # Drop expired buckets so the table stays bounded under IP spam
+            if len(self._buckets) > 10000:
+                self._buckets = {
+                    k: v for k, v in self._buckets.items()
+                    if now - v[0] < self.window_seconds
+                }
+
+            return count > self.max_attempts
+
+
+# Shared limiter for the login endpoint
+login_limiter = LoginRateLimiter()
+
+
 def role_required(required_role):
     """
     Decorator to check if user has required role
@@ -4,18 +4,12 @@ CLI entrypoint for mt-ddos-manager
 
 import click
 import logging
-from .config import Config
-from .db import init_db
-from .api import create_app
-from .monitor.worker import MonitorWorker
-from .tasks import scheduler, cleanup_old_data, backup_database
-from sqlalchemy.orm import Session
-from .db import get_db
-from .models import User
-import bcrypt
 
 logging.basicConfig(level=logging.INFO)
 
+# Heavy dependencies (SQLAlchemy, bcrypt, the worker stack) are imported
+# inside the subcommands that need them so `mt-ddos --help` stays fast.
+
 
 @click.group()
 def cli():
@@ -27,6 +21,9 @@ def cli():
 @click.option('--config', default='config.yml', help='Config file path')
 def init_db_cmd(config):
     """Initialize database"""
+    from .config import Config
+    from .db import init_db
+
     cfg = Config(config)
     init_db()
     click.echo("Database initialized")
@@ -38,6 +35,11 @@ def init_db_cmd(config):
 @click.option('--role', default='admin', type=click.Choice(['admin', 'operator', 'viewer']))
 def create_admin(username, password, role):
     """Create admin user"""
+    import bcrypt
+    from sqlalchemy.orm import Session
+    from .db import get_db
+    from .models import User
+
     db: Session = next(get_db())
 
     # Hash password
@@ -60,6 +62,10 @@ def create_admin(username, password, role):
 @click.option('--port', default=5000, help='API port')
 def run_api(config, host, port):
     """Run API server"""
+    from .config import Config
+    from .api import create_app
+    from .tasks import scheduler, cleanup_old_data, backup_database
+
     cfg = Config(config)
     app = create_app()
 
@@ -72,17 +78,25 @@ def run_api(config, host, port):
 
 
 @cli.command()
-@click.option('--router-id', required=True, type=int, help='Router ID to monitor')
-def monitor_router(router_id):
-    """Monitor specific router"""
-    worker = MonitorWorker(router_id)
-    worker.start()
+@click.option('--router-id', 'router_ids', required=True, type=int, multiple=True,
+              help='Router ID to monitor (repeatable)')
+def monitor_router(router_ids):
+    """Monitor specific router(s)"""
+    from .monitor.worker import run_monitors, flush_metrics
+    from .tasks import scheduler
+
+    # Periodic bulk flush of buffered metric rows
+    scheduler.add_task('metrics_flush', 5, flush_metrics)
+    scheduler.start()
 
     try:
-        worker.join()
+        run_monitors(router_ids)
     except KeyboardInterrupt:
-        worker.stop()
+        pass
+    finally:
+        scheduler.stop()
+        flush_metrics()
 
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
@@ -4,7 +4,6 @@ Loads from config.yml and overrides from environment variables
 """
 
 import os
-import yaml
 from typing import Dict, Any
 
 
@@ -20,8 +19,11 @@ class Config:
         config = {}
 
         if os.path.exists(self.config_path):
+            import yaml  # deferred - only pay the import when a file exists
             with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f) or {}
+                # libyaml's C loader when available; same safe semantics
+                loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+                config = yaml.load(f, Loader=loader) or {}
 
         # Override with environment variables
         # Format: MT_DDOS_<SECTION>_<KEY>
@@ -76,5 +78,6 @@ class Config:
 
     def save(self):
         """Save configuration to file"""
+        import yaml
         with open(self.config_path, 'w') as f:
             yaml.dump(self._config, f, default_flow_style=False)
\ No newline at end of file
@@ -4,18 +4,42 @@ SQLAlchemy wrapper with SQLite
 """
 
 import os
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool
 
 # Create engine
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///mt_ddos.db')
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith('sqlite') else {},
-    poolclass=StaticPool if DATABASE_URL.startswith('sqlite') else None,
-    echo=False  # Set to True for debugging
-)
+_is_sqlite = DATABASE_URL.startswith('sqlite')
+
+# Pool per backend: SQLite gets a connection per checkout (the old
+# StaticPool serialized all threads on a single connection) with WAL so
+# readers don't block the writer; server backends get a bounded QueuePool
+# with pre-ping so dead connections are recycled instead of erroring.
+if _is_sqlite:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        query_cache_size=1200,
+        echo=False  # Set to True for debugging
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=QueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        query_cache_size=1200,
+        echo=False  # Set to True for debugging
+    )
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -36,6 +60,10 @@ def get_db():
 
 def create_tables():
     """Create all tables"""
+    # Importing the models registers every table on Base.metadata, so
+    # create_all works no matter which caller runs first (the CLI defers
+    # its imports and may reach here before anything touched models)
+    from . import models  # noqa: F401
     Base.metadata.create_all(bind=engine)
 
 def create_default_admin():
@@ -3,7 +3,7 @@ SQLAlchemy models for mt-ddos-manager
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Text, ForeignKey, CheckConstraint, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .db import Base
@@ -76,8 +76,8 @@ class Event(Base):
     router_id = Column(Integer, ForeignKey("routers.id"), nullable=True)
     type = Column(String)
     detail = Column(Text)
-    meta = Column(Text)  # JSON
-    created_at = Column(DateTime, default=func.now())
+    meta = Column(JSON)  # driver handles (de)serialization
+    created_at = Column(DateTime, default=func.now(), index=True)
     severity = Column(String)
 
     # Relationships
@@ -89,13 +89,15 @@ class Metric(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     router_id = Column(Integer, ForeignKey("routers.id"))
-    ts = Column(DateTime, default=func.now())
+    ts = Column(DateTime, default=func.now(), index=True)
     total_connections = Column(Integer)
     new_connections = Column(Integer)
     packets_in = Column(Integer)
     packets_out = Column(Integer)
-    bytes_in = Column(Integer)
-    bytes_out = Column(Integer)
+    # Byte counters can exceed 2^31 within a poll window on fast links;
+    # the packet/connection counters comfortably fit 32 bits
+    bytes_in = Column(BigInteger)
+    bytes_out = Column(BigInteger)
 
     # Relationships
     router = relationship("Router", back_populates="metrics")
@@ -124,7 +126,7 @@ class ActionHistory(Base):
     router_id = Column(Integer, ForeignKey("routers.id"), nullable=True)
     action = Column(String)
     initiated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    detail = Column(Text)
+    detail = Column(JSON)  # driver handles (de)serialization
     created_at = Column(DateTime, default=func.now())
 
     # Relationships
@@ -16,40 +16,60 @@ class DetectionResult:
     targets: List[str]
 
 
+# Classification codes returned by _classify
+_OK = 0
+_HIGH_CONN = 1
+_HIGH_RATE = 2
+_HIGH_PACKETS = 3
+
+
+def _classify(conn_count: int, new_conn_delta: int, packets_in: int,
+              conn_thr: int, rate_thr: int, pkt_thr: int) -> int:
+    """Pure numeric threshold check - the per-poll hot path
+
+    Takes only scalars so every poll is a handful of integer compares
+    with no dict lookups or string work; the caller maps the code back
+    to an action and reason only when something actually trips.
+    """
+    if packets_in > pkt_thr:
+        return _HIGH_PACKETS
+    if conn_count > conn_thr:
+        return _HIGH_CONN
+    if new_conn_delta > rate_thr:
+        return _HIGH_RATE
+    return _OK
+
+
 class Monitor:
     """DDoS detection logic"""
 
     def __init__(self, thresholds: Dict[str, Any]):
         self.thresholds = thresholds
+        # Resolved once - sample() runs every poll and shouldn't repeat
+        # dict lookups with defaults each time
+        self._conn_thr = thresholds.get('conn_attack_threshold', 10000)
+        self._rate_thr = thresholds.get('new_conn_rate_threshold', 1000)
+        self._pkt_thr = thresholds.get('packet_threshold', 100000)
 
     def sample(self, conn_count: int, new_conn_delta: int, interface_stats: Dict[str, Any]) -> DetectionResult:
         """Sample current state and detect attacks"""
-        # Simple detection logic - can be extended
-        action = 'none'
-        reason = 'Normal traffic'
-        attackers = []
-        targets = []
-
-        # Check connection thresholds
-        if conn_count > self.thresholds.get('conn_attack_threshold', 10000):
-            action = 'tighten'
-            reason = f'High connection count: {conn_count}'
-        elif new_conn_delta > self.thresholds.get('new_conn_rate_threshold', 1000):
-            action = 'tighten'
-            reason = f'High new connection rate: {new_conn_delta}'
-
-        # Check packet rates
         packets_in = interface_stats.get('rx-packets-per-second', 0)
-        if packets_in > self.thresholds.get('packet_threshold', 100000):
-            action = 'tighten'
+        code = _classify(conn_count, new_conn_delta, packets_in,
+                         self._conn_thr, self._rate_thr, self._pkt_thr)
+
+        if code == _OK:
+            return DetectionResult(action='none', reason='Normal traffic',
+                                   attackers=[], targets=[])
+
+        if code == _HIGH_PACKETS:
             reason = f'High packet rate: {packets_in} packets/sec'
+        elif code == _HIGH_CONN:
+            reason = f'High connection count: {conn_count}'
+        else:
+            reason = f'High new connection rate: {new_conn_delta}'
 
-        return DetectionResult(
-            action=action,
-            reason=reason,
-            attackers=attackers,
-            targets=targets
-        )
+        return DetectionResult(action='tighten', reason=reason,
+                               attackers=[], targets=[])
 
     def detect_attack(self, current_state: Dict[str, Any]) -> DetectionResult:
         """Main detection method"""
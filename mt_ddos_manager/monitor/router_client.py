@@ -2,14 +2,167 @@
 Router client abstraction over librouteros
 """
 
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import librouteros
 from librouteros import connect
 from librouteros.exceptions import TrapError, FatalError, ConnectionClosed
+from librouteros.query import Key
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Query keys for server-side filtered prints
+_ID = Key('.id')
+_ADDRESS = Key('address')
+_LIST = Key('list')
+_TIMEOUT = Key('timeout')
+
+
+def _drain(reply) -> None:
+    """Exhaust a lazy command reply
+
+    Api.__call__ is a generator: the command sentence is only written
+    once the reply is consumed, so an unconsumed set/remove is a silent
+    no-op, and leftover reply rows would desync the pooled socket for
+    whichever command runs on it next.
+    """
+    collections.deque(reply, maxlen=0)
+
+
+def _first(reply):
+    """First row of a reply, draining the rest
+
+    Rows still arrive one at a time without materializing a tuple, but
+    the reply is always read through to !done - a partially-consumed
+    reply would leave rows on the socket for the connection's next
+    command (fatal once connections are pooled and reused).
+    """
+    rows = iter(reply)
+    first = next(rows, None)
+    collections.deque(rows, maxlen=0)
+    return first
+
+
+class RouterConnectionPool:
+    """Keyed pool of librouteros connections
+
+    Connections are pooled per (host, port, username) and reused LIFO so
+    warm sockets skip the TCP + login handshake on every poll. A daemon
+    pruner closes connections idle longer than max_idle_seconds while
+    keeping min_pool_size warm per key. Broken connections must go to
+    discard(), never back into the pool.
+    """
+
+    def __init__(self, max_idle_seconds: int = 300, min_pool_size: int = 0,
+                 prune_interval: int = 60):
+        self.max_idle_seconds = max_idle_seconds
+        self.min_pool_size = min_pool_size
+        self.prune_interval = prune_interval
+        self._idle = {}  # key -> deque[(connection, released_at)]
+        self._lock = threading.Lock()
+        self._pruner_started = False
+
+    def acquire(self, key: Tuple, connect_kwargs: Dict[str, Any]):
+        """Pop an idle connection for key, or establish a new one"""
+        self._ensure_pruner()
+
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                connection, _ = idle.pop()  # LIFO: most recent is warmest
+                return connection
+
+        return connect(**connect_kwargs)
+
+    def release(self, key: Tuple, connection):
+        """Return a healthy connection to the pool for reuse"""
+        with self._lock:
+            self._idle.setdefault(key, collections.deque()).append(
+                (connection, time.monotonic())
+            )
+
+    def discard(self, connection):
+        """Close a broken connection instead of pooling it"""
+        try:
+            connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing connection: {e}")
+
+    def _ensure_pruner(self):
+        if self._pruner_started:
+            return
+        with self._lock:
+            if not self._pruner_started:
+                threading.Thread(target=self._prune_loop, daemon=True).start()
+                self._pruner_started = True
+
+    def _prune_loop(self):
+        """Close connections idle longer than max_idle_seconds"""
+        while True:
+            time.sleep(self.prune_interval)
+            cutoff = time.monotonic() - self.max_idle_seconds
+            stale = []
+
+            with self._lock:
+                for idle in self._idle.values():
+                    # Oldest entries sit at the left of the deque
+                    while len(idle) > self.min_pool_size and idle and idle[0][1] < cutoff:
+                        stale.append(idle.popleft()[0])
+
+            for connection in stale:
+                self.discard(connection)
+
+
+# Shared pool for all RouterClient instances
+pool = RouterConnectionPool()
+
+# Small executor for overlapping poll commands in poll_batch()
+_batch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='mt-batch')
+
+
+class _TTLCache:
+    """Bounded LRU cache with per-entry TTL
+
+    Used to remember RouterOS .id values so repeated mitigation toggles
+    skip the full /print scan. Entries must be invalidated when a stale
+    id traps so the next call re-scans.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
 
 class RouterClient:
     """Client for MikroTik RouterOS API"""
@@ -21,61 +174,141 @@ class RouterClient:
         self.port = port
         self.use_ssl = use_ssl
         self._connection = None
+        self._rule_id_cache = _TTLCache(maxsize=256, ttl=60.0)       # comment_substr -> .id
+        self._entry_id_cache = _TTLCache(maxsize=256, ttl=60.0)      # (list_name, ip) -> .id
+        self._monitor_cache = {}                                     # iface -> (sampled_at, stats)
+        self._monitor_cache_lock = threading.Lock()
+
+    @property
+    def _pool_key(self) -> Tuple:
+        return (self.host, self.port, self.username)
 
     def connect(self):
-        """Establish connection to router"""
+        """Acquire a connection from the shared pool"""
         try:
-            self._connection = connect(
+            self._connection = pool.acquire(self._pool_key, dict(
                 host=self.host,
                 username=self.username,
                 password=self.password,
                 port=self.port,
                 ssl=self.use_ssl
-            )
+            ))
             logger.info(f"Connected to router {self.host}:{self.port}")
         except Exception as e:
             logger.error(f"Failed to connect to router {self.host}:{self.port}: {e}")
             raise
 
     def disconnect(self):
-        """Close connection"""
+        """Return the connection to the pool"""
+        with self._monitor_cache_lock:
+            self._monitor_cache.clear()
         if self._connection:
-            try:
-                self._connection.close()
-            except Exception as e:
-                logger.warning(f"Error closing connection: {e}")
+            pool.release(self._pool_key, self._connection)
             self._connection = None
 
     def is_connected(self) -> bool:
         """Check if connected"""
         return self._connection is not None
 
+    @contextmanager
+    def _api(self):
+        """Yield a live connection; discard it if the caller raises"""
+        if not self._connection:
+            self.connect()
+        try:
+            yield self._connection
+        except Exception:
+            # Broken sockets are closed, never returned to the pool
+            if self._connection:
+                pool.discard(self._connection)
+                self._connection = None
+            raise
+
+    @staticmethod
+    def _count_connections(api) -> int:
+        """Read the connection count off a live API connection"""
+        # count-only returns a single summary row
+        try:
+            result = _first(api('/ip/firewall/connection/print', count_only=True))
+            if result:
+                return int(result['count'])
+        except TrapError:
+            pass
+
+        # Older RouterOS: the stats print is also a single summary
+        # row - never materialize the full connection table
+        result = _first(api('/ip/firewall/connection/print', stats=True))
+        return int(result.get('count', 0)) if result else 0
+
     def get_total_connections_count(self) -> int:
         """Get total connections count"""
         try:
-            if not self._connection:
-                self.connect()
+            with self._api() as api:
+                return self._count_connections(api)
+        except Exception as e:
+            logger.error(f"Error getting connections count: {e}")
+            return 0
 
-            # Try print count-only first
-            result = tuple(self._connection('/ip/firewall/connection/print', count_only=True))
-            if result:
-                return result[0]['count']
-            else:
-                # Fallback to counting
-                connections = tuple(self._connection('/ip/firewall/connection/print'))
-                return len(connections)
+    def _count_on_pooled_connection(self) -> int:
+        """Connection count using its own pooled connection
+
+        Used by poll_batch() so the count can run while the client's
+        primary connection is blocked in monitor-traffic.
+        """
+        try:
+            connection = pool.acquire(self._pool_key, dict(
+                host=self.host,
+                username=self.username,
+                password=self.password,
+                port=self.port,
+                ssl=self.use_ssl
+            ))
         except Exception as e:
             logger.error(f"Error getting connections count: {e}")
             return 0
 
+        try:
+            count = self._count_connections(connection)
+        except Exception as e:
+            pool.discard(connection)
+            logger.error(f"Error getting connections count: {e}")
+            return 0
+
+        pool.release(self._pool_key, connection)
+        return count
+
+    def poll_batch(self, iface: str, duration: int = 1) -> Tuple[int, Dict[str, Any]]:
+        """Fetch connection count and interface stats for one poll
+
+        monitor-traffic blocks router-side for `duration` seconds, so the
+        cheap count runs concurrently on a second pooled connection and
+        the whole poll costs ~duration instead of duration plus an extra
+        round-trip.
+        """
+        count_future = _batch_executor.submit(self._count_on_pooled_connection)
+        stats = self.monitor_interface_traffic(iface, duration)
+        return count_future.result(), stats
+
     def monitor_interface_traffic(self, iface: str, duration: int = 1) -> Dict[str, Any]:
         """Monitor interface traffic"""
+        # The command blocks router-side for `duration` seconds, so
+        # concurrent callers within a 1s window share one sample instead
+        # of each paying their own blocking wait
+        with self._monitor_cache_lock:
+            cached = self._monitor_cache.get(iface)
+            if cached and time.monotonic() - cached[0] < 1.0:
+                return cached[1]
+
         try:
-            if not self._connection:
-                self.connect()
+            with self._api() as api:
+                # Only the first reply row is kept; _first still reads
+                # the reply to the end so the connection stays in sync
+                first = _first(api('/interface/monitor-traffic', interface=iface, duration=duration))
+                stats = dict(first) if first else {}
 
-            result = tuple(self._connection('/interface/monitor-traffic', interface=iface, duration=duration))
-            return dict(result[0]) if result else {}
+            with self._monitor_cache_lock:
+                self._monitor_cache[iface] = (time.monotonic(), stats)
+            return stats
         except Exception as e:
             logger.error(f"Error monitoring interface {iface}: {e}")
             return {}
@@ -83,11 +316,9 @@ class RouterClient:
     def run_script(self, name: str) -> Dict[str, Any]:
         """Run a script by name"""
         try:
-            if not self._connection:
-                self.connect()
-
-            result = tuple(self._connection('/system/script/run', numbers=name))
-            return {'success': True, 'result': dict(result[0]) if result else {}}
+            with self._api() as api:
+                first = _first(api('/system/script/run', numbers=name))
+                return {'success': True, 'result': dict(first) if first else {}}
         except Exception as e:
             logger.error(f"Error running script {name}: {e}")
             return {'success': False, 'error': str(e)}
@@ -95,22 +326,34 @@ class RouterClient:
     def set_filter_limit(self, comment_substr: str, **props) -> Dict[str, Any]:
         """Set filter rule limits"""
         try:
-            if not self._connection:
-                self.connect()
-
-            # Find rule by comment
-            rules = tuple(self._connection('/ip/firewall/filter/print'))
-            rule_id = None
-            for rule in rules:
-                if comment_substr in rule.get('comment', ''):
-                    rule_id = rule['.id']
-                    break
-
-            if rule_id:
-                self._connection('/ip/firewall/filter/set', numbers=rule_id, **props)
-                return {'success': True}
-            else:
-                return {'success': False, 'error': f'Rule with comment containing "{comment_substr}" not found'}
+            with self._api() as api:
+                # Cached id skips the full ruleset print
+                rule_id = self._rule_id_cache.get(comment_substr)
+                if rule_id is not None:
+                    try:
+                        _drain(api('/ip/firewall/filter/set', numbers=rule_id, **props))
+                        return {'success': True}
+                    except TrapError:
+                        # Stale id - drop it and fall through to a re-scan
+                        self._rule_id_cache.invalidate(comment_substr)
+
+                # Find rule by comment, consuming the reply lazily; once
+                # a match is captured the remaining rows are drained (not
+                # materialized) so the pooled socket stays in sync
+                rule_id = None
+                reply = api('/ip/firewall/filter/print')
+                for rule in reply:
+                    if comment_substr in rule.get('comment', ''):
+                        rule_id = rule['.id']
+                        _drain(reply)
+                        break
+
+                if rule_id:
+                    self._rule_id_cache.set(comment_substr, rule_id)
+                    _drain(api('/ip/firewall/filter/set', numbers=rule_id, **props))
+                    return {'success': True}
+                else:
+                    return {'success': False, 'error': f'Rule with comment containing "{comment_substr}" not found'}
         except Exception as e:
             logger.error(f"Error setting filter limit: {e}")
             return {'success': False, 'error': str(e)}
@@ -118,15 +361,20 @@ class RouterClient:
     def add_address_list(self, list_name: str, ip: str, timeout: Optional[str] = None) -> Dict[str, Any]:
         """Add IP to address list"""
         try:
-            if not self._connection:
-                self.connect()
+            with self._api() as api:
+                params = {'list': list_name, 'address': ip}
+                if timeout:
+                    params['timeout'] = timeout
+
+                first = _first(api('/ip/firewall/address-list/add', **params))
 
-            params = {'list': list_name, 'address': ip}
-            if timeout:
-                params['timeout'] = timeout
+                # Remember the new entry id so a later remove is O(1)
+                if first:
+                    new_id = first.get('ret') if isinstance(first, dict) else first
+                    if new_id:
+                        self._entry_id_cache.set((list_name, ip), new_id)
 
-            result = tuple(self._connection('/ip/firewall/address-list/add', **params))
-            return {'success': True, 'result': dict(result[0]) if result else {}}
+                return {'success': True, 'result': dict(first) if first else {}}
         except Exception as e:
             logger.error(f"Error adding address to list: {e}")
             return {'success': False, 'error': str(e)}
@@ -134,22 +382,31 @@ class RouterClient:
     def remove_address_list(self, list_name: str, ip: str) -> Dict[str, Any]:
         """Remove IP from address list"""
         try:
-            if not self._connection:
-                self.connect()
-
-            # Find entry
-            entries = tuple(self._connection('/ip/firewall/address-list/print'))
-            entry_id = None
-            for entry in entries:
-                if entry.get('list') == list_name and entry.get('address') == ip:
-                    entry_id = entry['.id']
-                    break
-
-            if entry_id:
-                self._connection('/ip/firewall/address-list/remove', numbers=entry_id)
-                return {'success': True}
-            else:
-                return {'success': False, 'error': f'Address {ip} not found in list {list_name}'}
+            with self._api() as api:
+                # Cached id skips the full address-list print
+                entry_id = self._entry_id_cache.get((list_name, ip))
+                if entry_id is not None:
+                    self._entry_id_cache.invalidate((list_name, ip))
+                    try:
+                        _drain(api('/ip/firewall/address-list/remove', numbers=entry_id))
+                        return {'success': True}
+                    except TrapError:
+                        pass  # stale id - fall through to a re-scan
+
+                # Let the router find the entry - returns at most one row
+                path = api.path('ip', 'firewall', 'address-list')
+                query = path.select(_ID, _ADDRESS, _LIST).where(
+                    _LIST == list_name,
+                    _ADDRESS == ip
+                )
+                entry = _first(query)
+                entry_id = entry['.id'] if entry else None
+
+                if entry_id:
+                    _drain(api('/ip/firewall/address-list/remove', numbers=entry_id))
+                    return {'success': True}
+                else:
+                    return {'success': False, 'error': f'Address {ip} not found in list {list_name}'}
         except Exception as e:
             logger.error(f"Error removing address from list: {e}")
             return {'success': False, 'error': str(e)}
@@ -157,12 +414,12 @@ class RouterClient:
     def list_address_list(self, list_name: str) -> Dict[str, Any]:
         """List addresses in address list"""
         try:
-            if not self._connection:
-                self.connect()
-
-            entries = tuple(self._connection('/ip/firewall/address-list/print'))
-            addresses = [entry for entry in entries if entry.get('list') == list_name]
-            return {'success': True, 'addresses': addresses}
+            with self._api() as api:
+                # Filter on the router and only pull the columns we use
+                path = api.path('ip', 'firewall', 'address-list')
+                query = path.select(_ID, _ADDRESS, _LIST, _TIMEOUT).where(_LIST == list_name)
+                addresses = [dict(entry) for entry in query]
+                return {'success': True, 'addresses': addresses}
         except Exception as e:
             logger.error(f"Error listing address list: {e}")
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            return {'success': False, 'error': str(e)}
@@ -2,111 +2,210 @@
 Monitor worker for individual routers
 """
 
+import asyncio
+import collections
+import logging
 import threading
 import time
-import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, SessionLocal
 from ..models import Router, RouterConfig, Metric, Event, ActionHistory
 from .router_client import RouterClient
 from .monitor import Monitor
-import json
 
 logger = logging.getLogger(__name__)
 
+# Shared bounded executor for blocking RouterOS/DB calls - poll fan-out
+# cannot grow the thread count past this no matter how many routers run.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='mt-poll')
+
+# Cap on simultaneously executing polls across all workers
+MAX_CONCURRENT_POLLS = 32
+
+# Buffered metric rows; polls append, flush_metrics() drains in bulk so
+# the hot path never pays a per-row INSERT + commit
+_metric_buffer = collections.deque()
+
+# Built once: every flush reuses the same insert construct, so SQLAlchemy
+# compiles (and caches) a single statement for the whole batch
+_METRIC_INSERT = Metric.__table__.insert()
+
+# Shared per-router client/monitor instances - workers come and go but
+# these persist, so connections and detection state are not rebuilt
+_clients = {}
+_monitors = {}
+_cache_lock = threading.Lock()
+
+
+def _get_client(router: Router) -> RouterClient:
+    """Get (or rebuild on endpoint change) the shared client for a router"""
+    with _cache_lock:
+        client = _clients.get(router.id)
+        if client is None or client.host != router.host or client.port != router.port:
+            client = RouterClient(
+                host=router.host,
+                username=router.username,
+                password=router.password,
+                port=router.port,
+                use_ssl=router.use_ssl
+            )
+            _clients[router.id] = client
+        return client
+
+
+def _get_monitor(router_id: int, thresholds: Dict[str, Any]) -> Monitor:
+    """Get (or rebuild on threshold change) the shared monitor for a router"""
+    with _cache_lock:
+        monitor = _monitors.get(router_id)
+        if monitor is None or monitor.thresholds != thresholds:
+            monitor = Monitor(thresholds)
+            _monitors[router_id] = monitor
+        return monitor
 
-class MonitorWorker(threading.Thread):
-    """Worker thread for monitoring a single router"""
+
+def flush_metrics():
+    """Flush buffered metric rows in one bulk INSERT"""
+    rows = []
+    while True:
+        try:
+            rows.append(_metric_buffer.popleft())
+        except IndexError:
+            break
+
+    if not rows:
+        return
+
+    try:
+        db: Session = next(get_db())
+        # Core insert + executemany: no ORM objects, no unit-of-work or
+        # identity-map bookkeeping on the hot write path
+        db.execute(_METRIC_INSERT, rows)
+        db.commit()
+        logger.debug(f"Flushed {len(rows)} metric rows")
+    except Exception as e:
+        logger.error(f"Error flushing {len(rows)} metrics: {e}")
+
+
+class MonitorWorker:
+    """Async poll loop for a single router
+
+    Workers are coroutines sharing one event loop, so hundreds of routers
+    can be monitored from a single OS thread. Blocking RouterOS and
+    database calls run in the default executor.
+    """
 
     def __init__(self, router_id: int, shared_queue=None):
-        super().__init__(daemon=True)
         self.router_id = router_id
         self.shared_queue = shared_queue
         self.running = True
         self.client = None
         self.monitor = None
         self.config = None
+        self.db = None  # lazily bound, reused across polls
 
-    def run(self):
+    async def run(self, semaphore: Optional[asyncio.Semaphore] = None):
         """Main worker loop"""
         logger.info(f"Starting monitor worker for router {self.router_id}")
+        loop = asyncio.get_running_loop()
+
+        # Polls fire on monotonic deadlines so poll latency doesn't
+        # stretch the cadence: a 30s interval stays 30s wall-to-wall
+        # instead of 30s + however long each poll took
+        next_t = time.monotonic()
 
         while self.running:
-            try:
-                # Load router config
-                db: Session = next(get_db())
-                router = db.query(Router).filter(Router.id == self.router_id).first()
-                if not router or not router.enabled:
-                    time.sleep(30)  # Wait before checking again
-                    continue
-
-                config = db.query(RouterConfig).filter(RouterConfig.router_id == self.router_id).first()
-                if not config:
-                    logger.warning(f"No config found for router {self.router_id}")
-                    time.sleep(30)
-                    continue
-
-                self.config = config
-
-                # Initialize client and monitor if needed
-                if not self.client:
-                    self.client = RouterClient(
-                        host=router.host,
-                        username=router.username,
-                        password=router.password,
-                        port=router.port,
-                        use_ssl=router.use_ssl
-                    )
-
-                if not self.monitor:
-                    thresholds = {
-                        'conn_attack_threshold': config.conn_attack_threshold or 10000,
-                        'new_conn_rate_threshold': config.new_conn_rate_threshold or 1000,
-                        'packet_threshold': 100000
-                    }
-                    self.monitor = Monitor(thresholds)
-
-                # Poll router
-                self._poll_router(router, config, db)
-
-                # Update last seen
-                router.last_seen = db.func.now()
-                db.commit()
-
-            except Exception as e:
-                logger.error(f"Error in monitor worker for router {self.router_id}: {e}")
-
-            # Wait for next poll
-            time.sleep(self.config.poll_interval or 30)
+            if semaphore:
+                async with semaphore:
+                    interval = await loop.run_in_executor(_executor, self._poll_once)
+            else:
+                interval = await loop.run_in_executor(_executor, self._poll_once)
+
+            next_t += interval
+            now = time.monotonic()
+            if now - next_t > interval:
+                # More than a full interval behind (slow poll, clock
+                # suspend) - resync rather than firing a catch-up burst
+                logger.warning(
+                    f"Router {self.router_id} poll fell {now - next_t:.1f}s behind; resyncing"
+                )
+                next_t = now
+            await asyncio.sleep(max(0.0, next_t - now))
+
+    def _poll_once(self) -> int:
+        """One blocking poll iteration; returns seconds until the next poll"""
+        try:
+            # Reuse one session per worker instead of re-checking out a
+            # pooled connection every iteration
+            if self.db is None:
+                self.db = SessionLocal()
+            db: Session = self.db
+            db.expire_all()  # force fresh reads of router/config rows
+
+            # Load router config
+            router = db.query(Router).filter(Router.id == self.router_id).first()
+            if not router or not router.enabled:
+                return 30  # Wait before checking again
+
+            config = db.query(RouterConfig).filter(RouterConfig.router_id == self.router_id).first()
+            if not config:
+                logger.warning(f"No config found for router {self.router_id}")
+                return 30
+
+            self.config = config
+
+            # Bind the shared client and monitor for this router
+            self.client = _get_client(router)
+            self.monitor = _get_monitor(router.id, {
+                'conn_attack_threshold': config.conn_attack_threshold or 10000,
+                'new_conn_rate_threshold': config.new_conn_rate_threshold or 1000,
+                'packet_threshold': 100000
+            })
+
+            # Poll router
+            self._poll_router(router, config, db)
+
+            # Update last seen
+            router.last_seen = db.func.now()
+            db.commit()
+
+        except Exception as e:
+            logger.error(f"Error in monitor worker for router {self.router_id}: {e}")
+
+        # Wait for next poll
+        return (self.config.poll_interval if self.config else None) or 30
 
     def stop(self):
         """Stop the worker"""
         self.running = False
         if self.client:
             self.client.disconnect()
+        if self.db:
+            self.db.close()
+            self.db = None
 
     def _poll_router(self, router: Router, config: RouterConfig, db: Session):
         """Poll the router for metrics and detect attacks"""
         try:
-            # Get current metrics
-            conn_count = self.client.get_total_connections_count()
-            interface_stats = self.client.monitor_interface_traffic('ether1')  # Assuming ether1
+            # Get current metrics; the two commands overlap router-side
+            conn_count, interface_stats = self.client.poll_batch('ether1')  # Assuming ether1
 
             # Calculate deltas (simplified - in real implementation, track previous values)
             new_conn_delta = 0  # Would need to track previous conn_count
 
-            # Create metric record
-            metric = Metric(
-                router_id=router.id,
-                total_connections=conn_count,
-                new_connections=new_conn_delta,
-                packets_in=interface_stats.get('rx-packets-per-second', 0),
-                packets_out=interface_stats.get('tx-packets-per-second', 0),
-                bytes_in=interface_stats.get('rx-bits-per-second', 0) // 8,
-                bytes_out=interface_stats.get('tx-bits-per-second', 0) // 8
-            )
-            db.add(metric)
+            # Buffer metric row for the next bulk flush
+            _metric_buffer.append({
+                'router_id': router.id,
+                'ts': datetime.now(),
+                'total_connections': conn_count,
+                'new_connections': new_conn_delta,
+                'packets_in': interface_stats.get('rx-packets-per-second', 0),
+                'packets_out': interface_stats.get('tx-packets-per-second', 0),
+                'bytes_in': interface_stats.get('rx-bits-per-second', 0) // 8,
+                'bytes_out': interface_stats.get('tx-bits-per-second', 0) // 8
+            })
 
             # Detect attacks
             current_state = {
@@ -122,11 +221,11 @@ class MonitorWorker(threading.Thread):
                     router_id=router.id,
                     type='attack_detected',
                     detail=result.reason,
-                    meta=json.dumps({
+                    meta={
                         'action': result.action,
                         'attackers': result.attackers,
                         'targets': result.targets
-                    }),
+                    },
                     severity='high'
                 )
                 db.add(event)
@@ -139,31 +238,46 @@ class MonitorWorker(threading.Thread):
         except Exception as e:
             logger.error(f"Error polling router {router.id}: {e}")
 
+    # Mitigation dispatch: action name -> (router script, history detail).
+    # New actions are added here instead of growing an if/elif chain.
+    ACTION_TABLE = {
+        'tighten': ('ddos-tighten', 'Automatic tighten due to attack detection'),
+        'restore': ('ddos-restore', 'Automatic restore to normal'),
+    }
+
     def _execute_action(self, action: str, router: Router, db: Session):
         """Execute mitigation action"""
+        script, detail = self.ACTION_TABLE.get(action, (None, None))
+        if not script:
+            return
+
         try:
-            if action == 'tighten':
-                # Run tighten script
-                result = self.client.run_script('ddos-tighten')
-                if result['success']:
-                    # Log action
-                    history = ActionHistory(
-                        router_id=router.id,
-                        action='tighten',
-                        detail='Automatic tighten due to attack detection'
-                    )
-                    db.add(history)
-                    logger.info(f"Tightened security on router {router.id}")
-            elif action == 'restore':
-                # Run restore script
-                result = self.client.run_script('ddos-restore')
-                if result['success']:
-                    history = ActionHistory(
-                        router_id=router.id,
-                        action='restore',
-                        detail='Automatic restore to normal'
-                    )
-                    db.add(history)
-                    logger.info(f"Restored normal security on router {router.id}")
+            result = self.client.run_script(script)
+            if result['success']:
+                # Log action
+                history = ActionHistory(
+                    router_id=router.id,
+                    action=action,
+                    detail=detail
+                )
+                db.add(history)
+                logger.info(f"Executed action {action} on router {router.id}")
         except Exception as e:
-            logger.error(f"Error executing action {action} on router {router.id}: {e}")
\ No newline at end of file
+            logger.error(f"Error executing action {action} on router {router.id}: {e}")
+
+
+def run_monitors(router_ids: Iterable[int]):
+    """Run monitor workers for the given routers on a single event loop"""
+    workers = [MonitorWorker(router_id) for router_id in router_ids]
+
+    async def _main():
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+        async with asyncio.TaskGroup() as group:
+            for worker in workers:
+                group.create_task(worker.run(semaphore))
+
+    try:
+        asyncio.run(_main())
+    finally:
+        for worker in workers:
+            worker.stop()
@@ -2,24 +2,72 @@
 Notifier subsystem for alerts
 """
 
+import queue
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import logging
 from typing import Dict, Any
 import smtplib
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
 
 class Notifier:
-    """Notification handler"""
+    """Notification handler
+
+    notify() is non-blocking: notifications are queued and a lazily
+    started sender thread drains them, so a burst of alerts (many routers
+    alarming at once) never stalls the monitor loop on HTTP/SMTP
+    round-trips.
+    """
 
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self._queue = queue.SimpleQueue()
+        self._sender = None
+        self._sender_lock = threading.Lock()
+
+        # One pooled session so Telegram/webhook sends reuse TCP+TLS
+        # connections instead of handshaking per alert
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+
+        # Persistent SMTP connection, established lazily
+        self._smtp = None
 
     def notify(self, router_name: str, action: str, details: Dict[str, Any], notification_type: str = 'all'):
-        """Send notification"""
+        """Queue a notification for delivery"""
+        self._ensure_sender()
+        self._queue.put((router_name, action, details, notification_type))
+
+    def _ensure_sender(self):
+        if self._sender is None:
+            with self._sender_lock:
+                if self._sender is None:
+                    self._sender = threading.Thread(target=self._drain, daemon=True)
+                    self._sender.start()
+
+    def _drain(self):
+        """Deliver queued notifications"""
+        while True:
+            router_name, action, details, notification_type = self._queue.get()
+            try:
+                self._deliver(router_name, action, details, notification_type)
+            except Exception as e:
+                logger.error(f"Failed to deliver notification: {e}")
+
+    def _deliver(self, router_name: str, action: str, details: Dict[str, Any], notification_type: str):
+        """Send a single notification over the configured channels"""
         message = self._format_message(router_name, action, details)
 
         if notification_type in ('telegram', 'all'):
@@ -45,7 +93,7 @@ class Notifier:
 
             url = f"https://api.telegram.org/bot{token}/sendMessage"
             data = {'chat_id': chat_id, 'text': message}
-            response = requests.post(url, data=data, timeout=10)
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
             logger.info("Telegram notification sent")
         except Exception as e:
@@ -63,24 +111,50 @@ class Notifier:
             if not all([smtp_server, smtp_user, smtp_pass, to_email]):
                 return
 
-            msg = MIMEMultipart()
-            msg['From'] = smtp_user
-            msg['To'] = to_email
-            msg['Subject'] = "MikroTik DDoS Alert"
+            msg = self._email_message(smtp_user, to_email, message)
 
-            msg.attach(MIMEText(message, 'plain'))
-
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            text = msg.as_string()
-            server.sendmail(smtp_user, to_email, text)
-            server.quit()
+            try:
+                server = self._smtp_connection(smtp_server, smtp_port, smtp_user, smtp_pass)
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Stale keep-alive connection - reconnect once and retry
+                self._smtp = None
+                server = self._smtp_connection(smtp_server, smtp_port, smtp_user, smtp_pass)
+                server.send_message(msg)
 
             logger.info("Email notification sent")
         except Exception as e:
+            self._smtp = None  # force a reconnect on the next alert
             logger.error(f"Failed to send email notification: {e}")
 
+    def _email_message(self, smtp_user: str, to_email: str, body: str) -> MIMEText:
+        """Build the alert email for one send
+
+        Constructed per message: MIMEText picks the charset from the
+        body (us-ascii or utf-8), whereas a reused template would lock
+        in whatever charset its first body needed.
+        """
+        msg = MIMEText(body, 'plain')
+        msg['From'] = smtp_user
+        msg['To'] = to_email
+        msg['Subject'] = "MikroTik DDoS Alert"
+        return msg
+
+    def _smtp_connection(self, smtp_server: str, smtp_port: int, smtp_user: str, smtp_pass: str):
+        """Return a live SMTP connection, reconnecting if the old one died"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._smtp = None
+
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()
+        server.login(smtp_user, smtp_pass)
+        self._smtp = server
+        return server
+
     def _send_webhook(self, router_name: str, action: str, details: Dict[str, Any]):
         """Send webhook notification"""
         try:
@@ -95,7 +169,7 @@ class Notifier:
                 'timestamp': details.get('timestamp')
             }
 
-            response = requests.post(webhook_url, json=payload, timeout=10)
+            response = self.session.post(webhook_url, json=payload, timeout=10)
             response.raise_for_status()
             logger.info("Webhook notification sent")
         except Exception as e:
@@ -2,10 +2,15 @@
 Background tasks and scheduler
 """
 
+import asyncio
+import functools
+import heapq
 import threading
 import time
 import logging
+from datetime import datetime, timedelta
 from typing import Dict, Any
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from .db import get_db
 from .models import Metric, Event
@@ -14,19 +19,34 @@ logger = logging.getLogger(__name__)
 
 
 class TaskScheduler:
-    """Background task scheduler"""
+    """Background task scheduler
+
+    Tasks are dispatched from a min-heap of (deadline, name): the
+    scheduler sleeps exactly until the earliest deadline instead of
+    polling every task on a fixed tick, so wakeups happen once per task
+    firing. The loop lives in one daemon thread; blocking task functions
+    run in the default executor.
+    """
 
     def __init__(self):
         self.tasks = {}
         self.running = True
+        self._heap = []  # (deadline, name)
+        self._heap_lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._thread = None
 
     def start(self):
         """Start scheduler"""
-        threading.Thread(target=self._run_scheduler, daemon=True).start()
+        self._thread = threading.Thread(target=self._run_scheduler, daemon=True)
+        self._thread.start()
 
     def stop(self):
         """Stop scheduler"""
         self.running = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
 
     def add_task(self, name: str, interval: int, func, *args, **kwargs):
         """Add recurring task"""
@@ -37,36 +57,102 @@ class TaskScheduler:
             'interval': interval,
             'last_run': 0
         }
+        with self._heap_lock:
+            heapq.heappush(self._heap, (time.monotonic() + interval, name))
+
+        # Wake the dispatcher so a task added after start is picked up
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
 
     def _run_scheduler(self):
-        """Run scheduler loop"""
-        while self.running:
-            current_time = time.time()
+        """Run the scheduler event loop"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
 
-            for name, task in self.tasks.items():
-                if current_time - task['last_run'] >= task['interval']:
-                    try:
-                        task['func'](*task['args'], **task['kwargs'])
-                        task['last_run'] = current_time
-                    except Exception as e:
-                        logger.error(f"Error running task {name}: {e}")
+        self._loop.create_task(self._dispatch())
+        self._loop.run_forever()
+        self._loop.close()
 
-            time.sleep(10)  # Check every 10 seconds
+    async def _dispatch(self):
+        """Pop deadlines from the heap and run tasks as they come due"""
+        loop = asyncio.get_running_loop()
 
+        while self.running:
+            with self._heap_lock:
+                deadline = self._heap[0][0] if self._heap else None
+
+            now = time.monotonic()
+            if deadline is None or deadline > now:
+                # Sleep until the earliest deadline (or a new task arrives)
+                timeout = None if deadline is None else deadline - now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            with self._heap_lock:
+                deadline, name = heapq.heappop(self._heap)
+
+            task = self.tasks.get(name)
+            if not task:
+                continue  # task was removed
+
+            try:
+                call = functools.partial(task['func'], *task['args'], **task['kwargs'])
+                await loop.run_in_executor(None, call)
+                task['last_run'] = time.time()
+            except Exception as e:
+                logger.error(f"Error running task {name}: {e}")
+
+            # Re-arm from the old deadline so cadence doesn't drift, but
+            # never schedule into the past
+            with self._heap_lock:
+                heapq.heappush(
+                    self._heap,
+                    (max(deadline + task['interval'], time.monotonic()), name)
+                )
+
+
+# Batched deletes via an id subquery (DELETE ... LIMIT is not available
+# on stock SQLite builds)
+_DELETE_METRICS_SQL = text(
+    "DELETE FROM metrics WHERE id IN "
+    "(SELECT id FROM metrics WHERE ts < :cutoff LIMIT :batch)"
+)
+_DELETE_EVENTS_SQL = text(
+    "DELETE FROM events WHERE id IN "
+    "(SELECT id FROM events WHERE created_at < :cutoff LIMIT :batch)"
+)
+
+
+def _batched_delete(db: Session, stmt, cutoff: datetime, batch_size: int) -> int:
+    """Delete matching rows in chunks, committing between batches"""
+    total = 0
+    while True:
+        deleted = db.execute(stmt, {'cutoff': cutoff, 'batch': batch_size}).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
 
-def cleanup_old_data(retention_days: int = 30):
-    """Clean up old metrics and events"""
+
+def cleanup_old_data(retention_days: int = 30, batch_size: int = 10000):
+    """Clean up old metrics and events
+
+    Deletes run in bounded batches with a commit between each, so row
+    locks are held briefly and concurrent metric inserts keep flowing
+    while a large backlog is trimmed.
+    """
     try:
         db: Session = next(get_db())
-        cutoff_date = db.func.now() - db.func.interval(retention_days, 'DAY')
+        cutoff = datetime.now() - timedelta(days=retention_days)
 
-        # Delete old metrics
-        deleted_metrics = db.query(Metric).filter(Metric.ts < cutoff_date).delete()
+        deleted_metrics = _batched_delete(db, _DELETE_METRICS_SQL, cutoff, batch_size)
+        deleted_events = _batched_delete(db, _DELETE_EVENTS_SQL, cutoff, batch_size)
 
-        # Delete old events
-        deleted_events = db.query(Event).filter(Event.created_at < cutoff_date).delete()
-
-        db.commit()
         logger.info(f"Cleaned up {deleted_metrics} metrics and {deleted_events} events")
     except Exception as e:
         logger.error(f"Error cleaning up old data: {e}")
@@ -78,4 +164,4 @@ def backup_database():
 
 
 # Global scheduler instance
-scheduler = TaskScheduler()
\ No newline at end of file
+scheduler = TaskScheduler()
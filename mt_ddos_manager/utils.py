@@ -5,18 +5,31 @@ Utility functions
 import json
 from typing import Any
 
+try:
+    import orjson  # optional - Rust JSON codec, several times faster than stdlib
+except ImportError:
+    orjson = None
 
-def safe_json_loads(data: str) -> dict:
+
+def safe_json_loads(data) -> dict:
     """Safely load JSON data"""
+    if not data:
+        return {}
     try:
-        return json.loads(data) if data else {}
-    except (json.JSONDecodeError, TypeError):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except (ValueError, TypeError):
         return {}
 
 
 def safe_json_dumps(data: Any) -> str:
     """Safely dump JSON data"""
+    if not data:
+        return '{}'
     try:
-        return json.dumps(data) if data else '{}'
-    except (TypeError, ValueError):
-        return '{}'
\ No newline at end of file
+        if orjson is not None:
+            return orjson.dumps(data).decode()
+        return json.dumps(data)
+    except (ValueError, TypeError):
+        return '{}'
@@ -4,6 +4,9 @@ MikroTik DDoS Monitor & Auto-Actuator
 A robust Python 3.11+ application for monitoring and mitigating DDoS attacks on MikroTik routers.
 """
 
+import copy
+import functools
+import ipaddress
 import os
 import sys
 import time
@@ -11,20 +14,45 @@ import logging
 import sqlite3
 import yaml
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import Counter
+from contextlib import closing
 from dataclasses import dataclass
 from pathlib import Path
 import signal
 import threading
+import queue
 
 try:
     import librouteros
     from librouteros import connect
     from librouteros.exceptions import TrapError, FatalError, ConnectionClosed
+    from librouteros.query import Key
 except ImportError:
     print("Error: librouteros is required. Install with: pip install librouteros")
     sys.exit(1)
 
+def _ip_key(ip_address: str):
+    """Compact set key for a blocked address
+
+    Integers are roughly half the size of the equivalent IP string in a
+    set, which matters once the blocklist grows to hundreds of
+    thousands of entries. Non-address values fall back to the raw
+    string.
+    """
+    try:
+        return int(ipaddress.ip_address(ip_address))
+    except ValueError:
+        return ip_address
+
+
+# Query keys for server-side filtered address-list reads
+_ID = Key('.id')
+_ADDRESS = Key('address')
+_LIST = Key('list')
+_COMMENT = Key('comment')
+_TIMEOUT = Key('timeout')
+
 
 @dataclass
 class DDoSEvent:
@@ -38,20 +66,52 @@ class DDoSEvent:
     action_taken: str
 
 
+@functools.lru_cache(maxsize=64)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse a YAML file, cached on (path, mtime, size)
+
+    Re-constructing a ConfigManager over an unchanged file skips both
+    the read and the parse; editing the file changes the stat key and
+    naturally invalidates the entry.
+    """
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
 class ConfigManager:
     """Manages application configuration"""
-    
+
     def __init__(self, config_path: str = "config.yml"):
         self.config_path = config_path
         self.config = self.load_config()
-    
+        # Flattened to dotted keys once so get() is a single dict lookup
+        # instead of a split + nested walk on every call
+        self._flat = self._flatten(self.config or {})
+
+    @staticmethod
+    def _flatten(tree: Dict, prefix: str = '') -> Dict:
+        """Flatten nested config into {'a.b.c': value} form
+
+        Intermediate dicts stay addressable (get('mikrotik') still
+        returns the whole section).
+        """
+        flat = {}
+        for key, value in tree.items():
+            dotted = prefix + key
+            flat[dotted] = value
+            if isinstance(value, dict):
+                flat.update(ConfigManager._flatten(value, dotted + '.'))
+        return flat
+
     def load_config(self) -> Dict:
         """Load configuration from YAML file"""
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                logging.info(f"Configuration loaded from {self.config_path}")
-                return config
+            st = os.stat(self.config_path)
+            # Deep copy so one instance mutating its config can't leak
+            # into other instances served from the cache
+            config = copy.deepcopy(_parse_yaml(self.config_path, st.st_mtime_ns, st.st_size))
+            logging.info(f"Configuration loaded from {self.config_path}")
+            return config
         except FileNotFoundError:
             logging.error(f"Configuration file {self.config_path} not found")
             sys.exit(1)
@@ -61,33 +121,65 @@ class ConfigManager:
     
     def get(self, key: str, default=None):
         """Get configuration value with dot notation support"""
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                return default
+        value = self._flat.get(key)
         return value if value is not None else default
 
 
+# Timestamps come back as datetime objects straight from the driver
+# instead of being re-parsed per row in Python. The converter is keyed
+# through the column alias below (PARSE_COLNAMES), so it also applies
+# to legacy databases whose column is still declared TEXT.
+sqlite3.register_converter(
+    "TIMESTAMP", lambda value: datetime.fromisoformat(value.decode())
+)
+
+# Event SQL, defined once - every flush/query reuses the same statement
+# text so sqlite3's statement cache always hits
+_INSERT_EVENT_SQL = '''
+    INSERT INTO events (timestamp, attack_type, source_ip, target_ip,
+                      packet_rate, severity, action_taken)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(timestamp, source_ip, attack_type)
+    DO UPDATE SET action_taken = excluded.action_taken
+'''
+_SELECT_RECENT_EVENTS_SQL = '''
+    SELECT timestamp AS "timestamp [TIMESTAMP]", attack_type, source_ip,
+           target_ip, packet_rate, severity, action_taken
+    FROM events
+    WHERE timestamp >= ?
+    ORDER BY timestamp DESC
+'''
+
+
 class DatabaseManager:
     """Manages SQLite database for event logging"""
-    
+
     def __init__(self, db_path: str = "ddos_events.db"):
         self.db_path = db_path
         self.conn = None
+        self._pending_events = []
         self.init_database()
-    
+
     def init_database(self):
         """Initialize database and create tables"""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            cursor = self.conn.cursor()
-            cursor.execute('''
+            self.conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            )
+            # WAL lets readers run alongside the writer and turns each
+            # commit into a sequential log append; synchronous=NORMAL
+            # drops the per-commit fsync (WAL stays durable on app crash)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA mmap_size=268435456")
+            self.conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+            self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
+                    timestamp TIMESTAMP NOT NULL,
                     attack_type TEXT NOT NULL,
                     source_ip TEXT NOT NULL,
                     target_ip TEXT NOT NULL,
@@ -96,10 +188,35 @@ class DatabaseManager:
                     action_taken TEXT NOT NULL
                 )
             ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_timestamp ON events(timestamp)
+            # The upsert's conflict target must also exist on databases
+            # created before the unique key was introduced - CREATE TABLE
+            # IF NOT EXISTS never alters an existing table. Collapse any
+            # duplicates a legacy table accumulated, then add the index.
+            have_unique = self.conn.execute('''
+                SELECT 1 FROM sqlite_master
+                WHERE type='index' AND name='idx_events_unique'
+            ''').fetchone()
+            if have_unique is None:
+                self.conn.execute('''
+                    DELETE FROM events WHERE rowid NOT IN (
+                        SELECT MIN(rowid) FROM events
+                        GROUP BY timestamp, source_ip, attack_type
+                    )
+                ''')
+                self.conn.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_events_unique
+                    ON events(timestamp, source_ip, attack_type)
+                ''')
+            # Covering index: get_recent_events reads every column it
+            # needs straight off the index, so no per-row table lookup
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_timestamp_cov ON events(
+                    timestamp DESC, source_ip, target_ip, attack_type,
+                    packet_rate, severity, action_taken
+                )
             ''')
-            cursor.execute('''
+            self.conn.execute("DROP INDEX IF EXISTS idx_timestamp")
+            self.conn.execute('''
                 CREATE INDEX IF NOT EXISTS idx_source_ip ON events(source_ip)
             ''')
             self.conn.commit()
@@ -109,59 +226,69 @@ class DatabaseManager:
             sys.exit(1)
     
     def log_event(self, event: DDoSEvent):
-        """Log a DDoS event to the database"""
+        """Queue a DDoS event for the next flush()"""
+        self._pending_events.append((
+            event.timestamp.isoformat(),
+            event.attack_type,
+            event.source_ip,
+            event.target_ip,
+            event.packet_rate,
+            event.severity,
+            event.action_taken
+        ))
+        logging.debug(f"Event queued: {event.source_ip} -> {event.target_ip}")
+
+    def log_events_bulk(self, events: List[DDoSEvent]):
+        """Write a batch of events in one transaction"""
+        for event in events:
+            self.log_event(event)
+        self.flush()
+
+    def flush(self):
+        """Write all queued events in a single transaction"""
+        if not self._pending_events:
+            return
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO events (timestamp, attack_type, source_ip, target_ip, 
-                                  packet_rate, severity, action_taken)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                event.timestamp.isoformat(),
-                event.attack_type,
-                event.source_ip,
-                event.target_ip,
-                event.packet_rate,
-                event.severity,
-                event.action_taken
-            ))
-            self.conn.commit()
-            logging.debug(f"Event logged: {event.source_ip} -> {event.target_ip}")
+            with self.conn:
+                # Re-logging the same detection (e.g. after a block) updates
+                # the existing row's action instead of inserting a duplicate
+                self.conn.executemany(_INSERT_EVENT_SQL, self._pending_events)
+            logging.debug(f"Flushed {len(self._pending_events)} events")
+            self._pending_events.clear()
         except sqlite3.Error as e:
-            logging.error(f"Error logging event: {e}")
+            logging.error(f"Error flushing events: {e}")
     
-    def get_recent_events(self, hours: int = 24) -> List[DDoSEvent]:
-        """Get recent events from the database"""
+    def get_recent_events(self, hours: int = 24,
+                          limit: Optional[int] = None) -> Iterator[DDoSEvent]:
+        """Stream recent events from the database
+
+        Rows are yielded as they arrive - the driver converts the
+        TIMESTAMP column itself, and the full result set is never held
+        in memory. Pass limit to bound large windows.
+        """
+        since = (datetime.now() - timedelta(hours=hours)).isoformat()
+        sql = _SELECT_RECENT_EVENTS_SQL
+        params = (since,)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params = (since, limit)
+
         try:
-            cursor = self.conn.cursor()
-            since = (datetime.now() - timedelta(hours=hours)).isoformat()
-            cursor.execute('''
-                SELECT timestamp, attack_type, source_ip, target_ip, 
-                       packet_rate, severity, action_taken
-                FROM events
-                WHERE timestamp >= ?
-                ORDER BY timestamp DESC
-            ''', (since,))
-            
-            events = []
-            for row in cursor.fetchall():
-                events.append(DDoSEvent(
-                    timestamp=datetime.fromisoformat(row[0]),
-                    attack_type=row[1],
-                    source_ip=row[2],
-                    target_ip=row[3],
-                    packet_rate=row[4],
-                    severity=row[5],
-                    action_taken=row[6]
-                ))
-            return events
+            cursor = self.conn.execute(sql, params)
         except sqlite3.Error as e:
             logging.error(f"Error retrieving events: {e}")
-            return []
+            return
+
+        # closing() releases the statement handle even if the caller
+        # abandons the generator before exhausting it
+        with closing(cursor):
+            for row in cursor:
+                yield DDoSEvent(*row)
     
     def close(self):
         """Close database connection"""
         if self.conn:
+            self.flush()
             self.conn.close()
 
 
@@ -173,25 +300,38 @@ class MikroTikMonitor:
         self.db = db
         self.api = None
         self.running = False
+        # Authoritative set of blocked addresses, seeded from the router
+        # on connect so membership checks never need an API round-trip
         self.blocked_ips = set()
-        
+        self._blocked_lock = threading.Lock()
+        # Blocks are queued here and issued by a background worker so the
+        # monitor loop never waits on per-IP RouterOS round-trips
+        self._block_queue = queue.Queue()
+        self._block_thread = None
+        # Set by stop(); lets the monitor loop wake mid-sleep so shutdown
+        # takes milliseconds instead of up to a full check interval
+        self._stop_event = threading.Event()
+
+    def _open_api_connection(self):
+        """Open a new RouterOS API connection"""
+        return connect(
+            host=self.config.get('mikrotik.host'),
+            username=self.config.get('mikrotik.username'),
+            password=self.config.get('mikrotik.password'),
+            port=self.config.get('mikrotik.port', 8728),
+            timeout=10
+        )
+
     def connect_to_router(self) -> bool:
         """Establish connection to MikroTik router"""
         try:
             host = self.config.get('mikrotik.host')
-            username = self.config.get('mikrotik.username')
-            password = self.config.get('mikrotik.password')
             port = self.config.get('mikrotik.port', 8728)
-            
+
             logging.info(f"Connecting to MikroTik router at {host}:{port}")
-            self.api = connect(
-                host=host,
-                username=username,
-                password=password,
-                port=port,
-                timeout=10
-            )
+            self.api = self._open_api_connection()
             logging.info("Successfully connected to MikroTik router")
+            self._seed_blocked_ips()
             return True
         except (TrapError, FatalError, ConnectionClosed) as e:
             logging.error(f"Failed to connect to MikroTik router: {e}")
@@ -200,17 +340,30 @@ class MikroTikMonitor:
             logging.error(f"Unexpected error connecting to router: {e}")
             return False
     
-    def get_connection_tracking(self) -> List[Dict]:
-        """Get connection tracking data from router"""
+    def _seed_blocked_ips(self):
+        """Load the current blocklist from the router into blocked_ips"""
+        try:
+            address_list = self.api.path('/ip/firewall/address-list')
+            list_name = self.config.get('detection.address_list_name', 'ddos_blocklist')
+            query = address_list.select(_ADDRESS, _LIST).where(_LIST == list_name)
+            seeded = {_ip_key(entry['address']) for entry in query}
+
+            with self._blocked_lock:
+                self.blocked_ips = seeded
+            logging.info(f"Seeded {len(seeded)} blocked IPs from router")
+        except Exception as e:
+            logging.error(f"Error seeding blocked IPs: {e}")
+
+    def get_connection_tracking(self) -> Iterator[Dict]:
+        """Stream connection tracking data from router"""
         try:
             if not self.api:
-                return []
-            
+                return
+
             tracking = self.api.path('/ip/firewall/connection/tracking')
-            return list(tracking)
+            yield from tracking
         except Exception as e:
             logging.error(f"Error getting connection tracking: {e}")
-            return []
     
     def analyze_traffic(self) -> List[DDoSEvent]:
         """Analyze traffic patterns for potential DDoS attacks"""
@@ -222,28 +375,29 @@ class MikroTikMonitor:
             return events
         
         try:
-            # Get firewall filter rules statistics
+            # Get firewall filter rules statistics; the reply streams
+            # straight into the Counter without a full list in memory
             firewall = self.api.path('/ip/firewall/filter')
-            rules = list(firewall)
-            
+
+            # Resolved once per cycle, not per rule/event
             threshold = self.config.get('detection.packet_threshold', 10000)
-            
-            # Analyze connection rates
-            connections = {}
-            for rule in rules:
-                src_addr = rule.get('src-address', '')
-                if src_addr:
-                    connections[src_addr] = connections.get(src_addr, 0) + 1
-            
+            target_ip = self.config.get('mikrotik.host', 'unknown')
+            now = datetime.now()
+
+            # Counter aggregates in C, skipping the per-rule dict.get + add
+            connections = Counter(
+                rule['src-address'] for rule in firewall if rule.get('src-address')
+            )
+
             # Detect anomalies
             for src_ip, count in connections.items():
                 if count > threshold:
                     severity = self.calculate_severity(count, threshold)
                     event = DDoSEvent(
-                        timestamp=datetime.now(),
+                        timestamp=now,
                         attack_type="High Connection Rate",
                         source_ip=src_ip,
-                        target_ip=self.config.get('mikrotik.host', 'unknown'),
+                        target_ip=target_ip,
                         packet_rate=count,
                         severity=severity,
                         action_taken="Pending"
@@ -268,24 +422,34 @@ class MikroTikMonitor:
         else:
             return "LOW"
     
-    def block_ip(self, ip_address: str, reason: str = "DDoS Attack") -> bool:
-        """Add IP address to block list"""
+    def block_ip(self, ip_address: str, reason: str = "DDoS Attack",
+                 when: Optional[datetime] = None, api=None) -> bool:
+        """Add IP address to block list
+
+        `when` lets callers stamp a whole batch with one timestamp
+        instead of a clock read per entry. `api` lets the block worker
+        pass its own connection - librouteros connections are not
+        thread-safe, so threads must never share self.api.
+        """
         try:
-            if ip_address in self.blocked_ips:
-                logging.debug(f"IP {ip_address} already blocked")
-                return True
-            
-            address_list = self.api.path('/ip/firewall/address-list')
+            key = _ip_key(ip_address)
+            with self._blocked_lock:
+                if key in self.blocked_ips:
+                    logging.debug(f"IP {ip_address} already blocked")
+                    return True
+
+            address_list = (api or self.api).path('/ip/firewall/address-list')
             list_name = self.config.get('detection.address_list_name', 'ddos_blocklist')
             
             address_list.add(
                 list=list_name,
                 address=ip_address,
-                comment=f"{reason} - {datetime.now().isoformat()}",
+                comment=f"{reason} - {(when or datetime.now()).isoformat()}",
                 timeout=self.config.get('detection.block_duration', '1h')
             )
             
-            self.blocked_ips.add(ip_address)
+            with self._blocked_lock:
+                self.blocked_ips.add(key)
             logging.info(f"Blocked IP {ip_address}: {reason}")
             return True
             
@@ -293,19 +457,81 @@ class MikroTikMonitor:
             logging.error(f"Error blocking IP {ip_address}: {e}")
             return False
     
+    def queue_block(self, ip_address: str, reason: str = "DDoS Attack"):
+        """Queue an IP for blocking by the background worker"""
+        if self._block_thread is None:
+            self._block_thread = threading.Thread(target=self._block_worker, daemon=True)
+            self._block_thread.start()
+        self._block_queue.put((ip_address, reason))
+
+    def _block_worker(self):
+        """Drain queued blocks in batches off the monitor thread
+
+        The worker issues blocks over its own API connection: the
+        monitor thread may be mid-reply on self.api (analyze_traffic
+        streams the filter print), and interleaving sentences from two
+        threads on one socket corrupts both commands.
+        """
+        worker_api = None
+        while True:
+            batch = [self._block_queue.get()]
+            # Coalesce whatever else is already queued (bounded) so a
+            # burst of attackers is handled in one pass
+            while len(batch) < 64:
+                try:
+                    batch.append(self._block_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if worker_api is None:
+                try:
+                    worker_api = self._open_api_connection()
+                except Exception as e:
+                    logging.error(f"Block worker could not connect: {e}")
+                    for item in batch:
+                        self._block_queue.put(item)
+                    if self._stop_event.wait(5):
+                        return
+                    continue
+
+            when = datetime.now()
+            ok = True
+            for ip_address, reason in batch:
+                ok = self.block_ip(ip_address, reason, when, api=worker_api) and ok
+
+            if not ok:
+                # A failed block may mean a dead connection - reopen
+                # before the next batch rather than failing forever
+                try:
+                    worker_api.close()
+                except Exception:
+                    pass
+                worker_api = None
+
     def unblock_ip(self, ip_address: str) -> bool:
         """Remove IP address from block list"""
         try:
             address_list = self.api.path('/ip/firewall/address-list')
             list_name = self.config.get('detection.address_list_name', 'ddos_blocklist')
-            
-            for entry in address_list:
-                if entry.get('address') == ip_address and entry.get('list') == list_name:
-                    address_list.remove(id=entry.get('.id'))
-                    self.blocked_ips.discard(ip_address)
-                    logging.info(f"Unblocked IP {ip_address}")
-                    return True
-            
+
+            # Let the router find the entry - at most one row comes back
+            query = address_list.select(_ID).where(
+                _LIST == list_name,
+                _ADDRESS == ip_address
+            )
+            rows = iter(query)
+            entry = next(rows, None)
+            # Read the reply through to !done - leftover sentences would
+            # desync self.api for the next command
+            for _ in rows:
+                pass
+            if entry:
+                address_list.remove(entry['.id'])
+                with self._blocked_lock:
+                    self.blocked_ips.discard(_ip_key(ip_address))
+                logging.info(f"Unblocked IP {ip_address}")
+                return True
+
             logging.warning(f"IP {ip_address} not found in block list")
             return False
             
@@ -318,17 +544,16 @@ class MikroTikMonitor:
         try:
             address_list = self.api.path('/ip/firewall/address-list')
             list_name = self.config.get('detection.address_list_name', 'ddos_blocklist')
-            
-            blocked = []
-            for entry in address_list:
-                if entry.get('list') == list_name:
-                    blocked.append({
-                        'address': entry.get('address'),
-                        'comment': entry.get('comment', ''),
-                        'timeout': entry.get('timeout', 'permanent')
-                    })
-            
-            return blocked
+
+            # Filter on the router and only pull the columns we use
+            query = address_list.select(_ADDRESS, _COMMENT, _TIMEOUT).where(
+                _LIST == list_name
+            )
+            return [{
+                'address': entry.get('address'),
+                'comment': entry.get('comment', ''),
+                'timeout': entry.get('timeout', 'permanent')
+            } for entry in query]
             
         except Exception as e:
             logging.error(f"Error getting blocked IPs: {e}")
@@ -353,26 +578,29 @@ class MikroTikMonitor:
                 logging.debug(f"Found {len(events)} potential DDoS events")
                 
                 for event in events:
-                    # Log event to database
-                    self.db.log_event(event)
-                    
-                    # Auto-block if enabled
+                    # Auto-block if enabled; blocks go through the queue
+                    # so this loop never blocks on RouterOS round-trips
                     if auto_block and event.severity in ['HIGH', 'CRITICAL']:
-                        if self.block_ip(event.source_ip, event.attack_type):
-                            event.action_taken = "Blocked"
-                            self.db.log_event(event)
-                
-                # Sleep until next check
+                        self.queue_block(event.source_ip, event.attack_type)
+                        event.action_taken = "Blocked"
+                    self.db.log_event(event)
+
+                # One transaction per iteration covers all queued events
+                self.db.flush()
+
+                # Sleep until next check, or until stop() wakes us
                 logging.debug(f"Sleeping for {check_interval} seconds")
-                time.sleep(check_interval)
-                
+                if self._stop_event.wait(check_interval):
+                    break
+
             except KeyboardInterrupt:
                 logging.info("Monitoring interrupted by user")
                 self.running = False
                 break
             except Exception as e:
                 logging.error(f"Error in monitoring loop: {e}")
-                time.sleep(check_interval)
+                if self._stop_event.wait(check_interval):
+                    break
         
         logging.info("Monitoring loop stopped")
     
@@ -394,6 +622,7 @@ class MikroTikMonitor:
     def stop(self):
         """Stop the monitor"""
         self.running = False
+        self._stop_event.set()
         if self.api:
             self.api.close()
 
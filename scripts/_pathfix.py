@@ -0,0 +1,14 @@
+"""
+Shared sys.path setup for the CLI scripts
+
+Importing this module makes the repository root importable exactly once,
+instead of every script unconditionally inserting its own (duplicate)
+copy at the front of sys.path.
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
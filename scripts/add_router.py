@@ -3,12 +3,10 @@
 CLI tool to add a router to the database
 """
 
-import sys
 import click
 from sqlalchemy.orm import Session
 
-# Add package to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _pathfix  # noqa: F401  (makes the repo root importable)
 
 from mt_ddos_manager.db import get_db
 from mt_ddos_manager.models import Router, RouterConfig
@@ -26,6 +24,10 @@ def add_router(name, host, port, username, password, use_ssl, tags):
     """Add a router to the database"""
     db: Session = next(get_db())
 
+    # Normalize tags once at write time (trimmed, deduplicated, sorted)
+    # so readers can split/compare without cleaning the CSV first
+    tags = ",".join(sorted({t.strip() for t in tags.split(",") if t.strip()}))
+
     # Check if router exists
     existing = db.query(Router).filter(Router.name == name).first()
     if existing:
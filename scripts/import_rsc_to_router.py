@@ -3,12 +3,10 @@
 Import RouterOS scripts to a router
 """
 
-import sys
 import click
 from sqlalchemy.orm import Session
 
-# Add package to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _pathfix  # noqa: F401  (makes the repo root importable)
 
 from mt_ddos_manager.db import get_db
 from mt_ddos_manager.models import Router
@@ -4,12 +4,10 @@ Initialize database and create admin user
 """
 
 import os
-import sys
 import bcrypt
 from sqlalchemy.orm import Session
 
-# Add package to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _pathfix  # noqa: F401  (makes the repo root importable)
 
 from mt_ddos_manager.db import init_db, get_db
 from mt_ddos_manager.models import User
@@ -25,8 +23,10 @@ def create_admin_user(password: str):
         print("Admin user already exists")
         return
 
-    # Hash password
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    # Hash password; BCRYPT_ROUNDS lets dev/CI drop below the production
+    # default of 12 (each extra round doubles the hash cost)
+    rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
 
     admin = User(
         username='admin',
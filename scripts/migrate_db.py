@@ -9,8 +9,7 @@ import sqlite3
 import logging
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _pathfix  # noqa: F401  (makes the repo root importable)
 
 from models import get_database
 
@@ -34,14 +33,18 @@ def run_migration(db_path: str = 'ddos_events.db', migration_file: str = 'migrat
         
         logging.info(f"Running migration from {migration_file}")
         
-        # Connect to database
+        # Connect to database; autocommit off so the explicit BEGIN/COMMIT
+        # around the script wins over executescript's implicit commits
         conn = sqlite3.connect(db_path)
+        conn.isolation_level = None
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
         cursor = conn.cursor()
-        
-        # Execute migration SQL
+
+        # Execute migration SQL in one transaction: one fsync for the
+        # whole script instead of one per statement
         try:
-            cursor.executescript(migration_sql)
-            conn.commit()
+            cursor.executescript(f"BEGIN;\n{migration_sql}\nCOMMIT;")
             logging.info("Migration completed successfully")
             
             # Verify tables were created
@@ -79,28 +82,34 @@ def init_database_with_orm(db_path: str = 'ddos_events.db'):
         
         logging.info("Database tables created successfully")
         
-        # Insert default settings
+        # Insert default settings in one statement; OR IGNORE replaces the
+        # per-key SELECT-then-INSERT round trips
         session = db_manager.get_session()
         try:
-            from models import Setting
-            
+            from sqlalchemy import text
+
             default_settings = [
-                Setting(key='check_interval', value='30', description='Monitoring check interval in seconds'),
-                Setting(key='packet_threshold', value='10000', description='Packet rate threshold for detection'),
-                Setting(key='auto_block_enabled', value='true', description='Enable automatic IP blocking'),
-                Setting(key='block_duration', value='1h', description='Default block duration'),
-                Setting(key='retention_days', value='30', description='Event retention period in days'),
-                Setting(key='database_version', value='1', description='Database schema version'),
+                ('check_interval', '30', 'Monitoring check interval in seconds'),
+                ('packet_threshold', '10000', 'Packet rate threshold for detection'),
+                ('auto_block_enabled', 'true', 'Enable automatic IP blocking'),
+                ('block_duration', '1h', 'Default block duration'),
+                ('retention_days', '30', 'Event retention period in days'),
+                ('database_version', '1', 'Database schema version'),
             ]
-            
-            for setting in default_settings:
-                existing = session.query(Setting).filter_by(key=setting.key).first()
-                if not existing:
-                    session.add(setting)
-            
+
+            # updated_at is NOT NULL with only a Python-side default, so
+            # the raw SQL must supply it - otherwise OR IGNORE swallows
+            # the constraint violation and zero rows are inserted
+            session.execute(
+                text("INSERT OR IGNORE INTO settings "
+                     "(key, value, description, updated_at) "
+                     "VALUES (:key, :value, :description, CURRENT_TIMESTAMP)"),
+                [{'key': key, 'value': value, 'description': description}
+                 for key, value, description in default_settings]
+            )
             session.commit()
             logging.info("Default settings inserted")
-            
+
         finally:
             session.close()
         
@@ -8,3 +8,44 @@ import os
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models import Base
+from mt_ddos_monitor import DatabaseManager
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """One in-memory engine + schema for the whole test session"""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine):
+    """Session wrapped in a transaction that is rolled back after the test
+
+    Commits inside a test become savepoint releases, so every test sees
+    an empty database without rebuilding the schema.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    yield session
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db():
+    """Initialized in-memory DatabaseManager, closed on teardown"""
+    manager = DatabaseManager(':memory:')
+    yield manager
+    manager.close()
@@ -12,7 +12,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.app import app
 
 
-@pytest.fixture
+# Session-scoped: one app/test client serves every test here instead of
+# paying client setup and teardown per test; the tests only read state
+@pytest.fixture(scope="session")
 def client():
     """Create test client"""
     app.config['TESTING'] = True
@@ -20,7 +22,7 @@ def client():
         yield client
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_key():
     """API key for testing"""
     return 'changeme'
@@ -0,0 +1,49 @@
+"""
+Tests for the database migration script
+"""
+
+import os
+import sys
+
+# Add the scripts directory to the path
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from migrate_db import init_database_with_orm
+from models import get_database, Setting
+
+
+def test_init_database_with_orm_seeds_settings(tmp_path):
+    """Default settings must actually land in the table
+
+    INSERT OR IGNORE silently swallows constraint violations, so a
+    success return alone does not prove the rows were inserted.
+    """
+    db_path = str(tmp_path / "orm_init.db")
+
+    assert init_database_with_orm(db_path) is True
+
+    session = get_database(f'sqlite:///{db_path}').get_session()
+    try:
+        settings = {s.key: s for s in session.query(Setting).all()}
+        assert len(settings) == 6
+        assert settings['database_version'].value == '1'
+        assert settings['check_interval'].value == '30'
+        # The NOT NULL column the raw insert has to populate itself
+        assert all(s.updated_at is not None for s in settings.values())
+    finally:
+        session.close()
+
+
+def test_init_database_with_orm_is_idempotent(tmp_path):
+    """Re-running the init must not duplicate or error on settings"""
+    db_path = str(tmp_path / "orm_init.db")
+
+    assert init_database_with_orm(db_path) is True
+    assert init_database_with_orm(db_path) is True
+
+    session = get_database(f'sqlite:///{db_path}').get_session()
+    try:
+        assert session.query(Setting).count() == 6
+    finally:
+        session.close()